@@ -10,6 +10,7 @@ from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN
 from pptx.dml.color import RGBColor
 import tempfile
+import threading
 import uuid
 import openai  
 
@@ -21,7 +22,7 @@ app.secret_key = os.environ.get("SESSION_SECRET", "kindergarten-slides-secret-ke
 
 # API configurations
 PIXABAY_API_KEY = os.environ.get("PIXABAY_API_KEY", "your-pixabay-api-key")
-PIXABAY_BASE_URL = "https://pixabay.com/api/"
+PIXABAY_BASE_URL = os.environ.get("PIXABAY_BASE_URL", "https://pixabay.com/api/")
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
 
 # Initialize OpenAI API key (older SDK style)
@@ -29,9 +30,31 @@ if OPENAI_API_KEY:
     openai.api_key = OPENAI_API_KEY
 
 
-# Global flag to disable AI validation when rate limits are hit
+class RuntimeState:
+    """Process-wide mutable state shared by all request threads"""
+
+    def __init__(self, ai_validation_disabled=False):
+        self._lock = threading.Lock()
+        self._ai_validation_disabled = ai_validation_disabled
+
+    @property
+    def ai_validation_disabled(self):
+        with self._lock:
+            return self._ai_validation_disabled
+
+    def disable_ai_validation(self):
+        """Turn off AI validation, e.g. after an OpenAI rate limit"""
+        with self._lock:
+            self._ai_validation_disabled = True
+
+
+# Resolve custom topic images from a few broad category queries before per-item searches
+BULK_RESOLUTION_ENABLED = os.environ.get("BULK_RESOLUTION", "true").lower() != "false"
+BULK_PER_PAGE = 200  # Pixabay maximum
+
+# Shared runtime state; safe to use from gthread/gevent workers
 # Temporarily disable AI to prevent rate limit errors
-ai_validation_disabled = True
+runtime = RuntimeState(ai_validation_disabled=True)
 
 # Topic definitions
 TOPICS = {
@@ -101,6 +124,49 @@ SEARCH_TERMS = {
     }
 }
 
+# Categories for custom topic items: keywords to classify an item, a suffix for
+# per-item search terms, and broad queries used by bulk resolution
+CUSTOM_CATEGORIES = {
+    "vehicle": {
+        "keywords": ['car', 'bus', 'truck', 'train', 'plane', 'bike', 'auto', 'lorry', 'helicopter'],
+        "suffix": "vehicle transport illustration",
+        "queries": ["vehicle transport cartoon", "vehicles illustration"]
+    },
+    "animal": {
+        "keywords": ['dog', 'cat', 'bird', 'fish', 'lion', 'tiger', 'elephant', 'horse',
+                     'giraffe', 'zebra', 'penguin', 'monkey', 'rabbit', 'bunny', 'panda', 'koala',
+                     'kangaroo', 'camel', 'deer', 'fox', 'wolf', 'mouse', 'squirrel', 'hippo',
+                     'rhino', 'crocodile', 'turtle', 'frog', 'duck', 'chicken', 'cow', 'pig',
+                     'sheep', 'goat', 'whale', 'dolphin', 'shark', 'octopus', 'snake', 'parrot',
+                     'butterfly', 'leopard', 'cheetah'],
+        "suffix": "animal cute illustration",
+        "queries": ["cute animal cartoon", "animals illustration"]
+    },
+    "fruit": {
+        "keywords": ['apple', 'banana', 'orange', 'grape', 'strawberry', 'mango'],
+        "suffix": "fresh fruit illustration",
+        "queries": ["fruit cartoon", "fruits illustration"]
+    },
+    "color": {
+        "keywords": ['red', 'blue', 'green', 'yellow', 'purple', 'orange', 'pink'],
+        "suffix": "color bright illustration",
+        "queries": ["colors cartoon"]
+    },
+    "generic": {
+        "keywords": [],
+        "suffix": "simple children illustration",
+        "queries": []
+    }
+}
+
+def classify_custom_item(item):
+    """Return the CUSTOM_CATEGORIES key for a custom topic item"""
+    item_lower = item.lower()
+    for category, config in CUSTOM_CATEGORIES.items():
+        if any(word in item_lower for word in config['keywords']):
+            return category
+    return "generic"
+
 def validate_image_relevance(tags, search_words, item_name):
     """Check if image tags are relevant to the search item"""
     tags_lower = tags.lower()
@@ -232,13 +298,13 @@ def search_pixabay_image(search_term, item_name=None):
 
 def validate_image_with_ai(image_data, expected_item):
     """Use OpenAI's vision model to validate if image matches the expected item"""
-    global ai_validation_disabled
+    ai_validation_disabled = runtime.ai_validation_disabled
     
-    if not openai_client or ai_validation_disabled:
+    if not OPENAI_API_KEY or ai_validation_disabled:
         if ai_validation_disabled:
             logging.warning("AI validation disabled due to rate limits, using tag validation only")
         else:
-            logging.warning("OpenAI client not available, using tag validation only")
+            logging.warning("OpenAI API key not configured, using tag validation only")
         return True  # Fall back to tag validation if no OpenAI or disabled
     
     try:
@@ -300,7 +366,7 @@ def validate_image_with_ai(image_data, expected_item):
         error_str = str(e).lower()
         if "429" in error_str or "rate" in error_str or "too many requests" in error_str:
             logging.warning(f"OpenAI rate limit hit for '{expected_item}', disabling AI validation for this session")
-            globals()['ai_validation_disabled'] = True  # Disable AI for the rest of this session
+            runtime.disable_ai_validation()  # Disable AI for the rest of this session
             return True  # Accept image with tag validation only
         elif "timeout" in error_str:
             logging.warning(f"OpenAI timeout for '{expected_item}', falling back to tag validation")
@@ -415,6 +481,95 @@ def search_pixabay_with_smart_fallback(search_term, item_name=None):
     logging.warning(f"❌ No suitable images found for: {item_name or search_term}")
     return None
 
+def hit_matches_item(tags, item):
+    """Check if any whole image tag is the item's main word (or its plural)"""
+    main_word = (item.split(' - ')[-1] if ' - ' in item else item).lower().strip()
+    if not main_word:
+        return False
+    
+    return any(tag.strip() in (main_word, main_word + 's', main_word + 'es')
+               for tag in tags.lower().split(','))
+
+def bulk_resolve_images(topic, items, item_categories):
+    """Resolve images for many items from a few broad queries.
+    
+    Issues queries for the topic name plus the broad queries of each
+    category present, pools the hits and matches items against them by tags.
+    Candidates go through the same tag and (capped) AI validation as
+    search_pixabay_with_smart_fallback. Returns a dict of item -> image
+    stream; unmatched items are left out so the caller can fall back to
+    per-item searches.
+    """
+    queries = [topic, f"{topic} cartoon"]
+    for category in dict.fromkeys(item_categories[item] for item in items):
+        queries.extend(CUSTOM_CATEGORIES[category]['queries'])
+    
+    # Pool hits from all broad queries, skipping duplicates
+    hit_pool = []
+    seen_ids = set()
+    for query in dict.fromkeys(queries):
+        try:
+            params = {
+                'key': PIXABAY_API_KEY,
+                'q': query[:100],  # Pixabay limits queries to 100 characters
+                'image_type': 'illustration',
+                'safesearch': 'true',
+                'per_page': BULK_PER_PAGE,
+                'min_width': 300,
+                'min_height': 200
+            }
+            response = requests.get(PIXABAY_BASE_URL, params=params, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            
+            for hit in data.get('hits', []):
+                if hit.get('id') not in seen_ids:
+                    seen_ids.add(hit.get('id'))
+                    hit_pool.append(hit)
+        except Exception as e:
+            logging.error(f"Error in bulk search for '{query}': {str(e)}")
+            continue
+    
+    logging.info(f"Bulk resolution for '{topic}': {len(hit_pool)} hits from {len(set(queries))} queries")
+    
+    # Match items against the pool, using each image at most once
+    resolved = {}
+    used_ids = set()
+    for item in items:
+        base_word = item.split(' - ')[-1] if ' - ' in item else item
+        search_words = base_word.split()
+        ai_validated_count = 0
+        max_ai_validations = 3  # Limit AI calls to prevent rate limits
+        
+        for hit in hit_pool:
+            tags = hit.get('tags', '')
+            if hit.get('id') in used_ids or not hit_matches_item(tags, item):
+                continue
+            if not validate_image_relevance(tags, search_words, item):
+                continue
+            
+            downloaded_image = download_image(hit['webformatURL'])
+            if not downloaded_image:
+                continue
+            
+            # AI validation (with rate limiting and error handling)
+            if ai_validated_count < max_ai_validations:
+                ai_validated_count += 1
+                try:
+                    if not validate_image_with_ai(downloaded_image.getvalue(), item):
+                        logging.info(f"❌ AI rejected bulk image for '{item}', trying next option")
+                        continue
+                except Exception as ai_error:
+                    logging.warning(f"AI validation error for '{item}': {str(ai_error)}, using tag validation only")
+            
+            used_ids.add(hit.get('id'))
+            resolved[item] = downloaded_image
+            logging.info(f"📦 BULK MATCHED image for '{item}' (tags: {tags[:100]})")
+            break
+    
+    logging.info(f"Bulk resolution matched {len(resolved)}/{len(items)} items for '{topic}'")
+    return resolved
+
 def create_text_based_visual(slide, item):
     """Create an attractive text-based visual when no image is available"""
     # Create a colorful background shape
@@ -497,8 +652,9 @@ def download_image(image_url):
         logging.error(f"Error downloading image from {image_url}: {str(e)}")
         return None
 
-def create_presentation(topic, items, search_terms):
+def create_presentation(topic, items, search_terms, prefetched_images=None):
     """Create PowerPoint presentation for the given topic"""
+    prefetched_images = prefetched_images or {}
     try:
         # Create presentation
         prs = Presentation()
@@ -552,9 +708,11 @@ def create_presentation(topic, items, search_terms):
                 title_paragraph.font.color.rgb = RGBColor(46, 125, 50)  # Green
                 title_paragraph.alignment = PP_ALIGN.CENTER
                 
-                # Search and add image with smart fallback
-                search_term = search_terms.get(item, item + " cartoon")
-                image_stream = search_pixabay_with_smart_fallback(search_term, item)
+                # Use bulk-resolved image if available, otherwise search with smart fallback
+                image_stream = prefetched_images.get(item)
+                if not image_stream:
+                    search_term = search_terms.get(item, item + " cartoon")
+                    image_stream = search_pixabay_with_smart_fallback(search_term, item)
                 
                 if image_stream:
                     # Add image to slide
@@ -593,6 +751,8 @@ def generate_presentation():
         custom_topic = request.form.get('custom_topic', '').strip()
         custom_items = request.form.get('custom_items', '').strip()
         
+        item_categories = {}
+        
         # Handle custom topic
         if topic == "custom" and custom_topic and custom_items:
             topic = custom_topic
@@ -606,17 +766,9 @@ def generate_presentation():
             search_terms = {}
             for item in items:
                 # Create more specific search terms based on common categories
-                item_lower = item.lower()
-                if any(word in item_lower for word in ['car', 'bus', 'truck', 'train', 'plane', 'bike', 'auto', 'lorry', 'helicopter']):
-                    search_terms[item] = f"{item} vehicle transport illustration"
-                elif any(word in item_lower for word in ['dog', 'cat', 'bird', 'fish', 'lion', 'tiger', 'elephant', 'horse']):
-                    search_terms[item] = f"{item} animal cute illustration"
-                elif any(word in item_lower for word in ['apple', 'banana', 'orange', 'grape', 'strawberry', 'mango']):
-                    search_terms[item] = f"{item} fresh fruit illustration"
-                elif any(word in item_lower for word in ['red', 'blue', 'green', 'yellow', 'purple', 'orange', 'pink']):
-                    search_terms[item] = f"{item} color bright illustration"
-                else:
-                    search_terms[item] = f"{item} simple children illustration"
+                category = classify_custom_item(item)
+                item_categories[item] = category
+                search_terms[item] = f"{item} {CUSTOM_CATEGORIES[category]['suffix']}"
             
         elif topic and topic in TOPICS:
             # Use predefined topic
@@ -632,9 +784,14 @@ def generate_presentation():
         
         logging.info(f"Generating presentation for topic: {topic}")
         
+        # Resolve as many custom topic images as possible from a few broad category queries
+        prefetched_images = {}
+        if item_categories and BULK_RESOLUTION_ENABLED:
+            prefetched_images = bulk_resolve_images(topic, items, item_categories)
+        
         # Create presentation with enhanced error handling
         try:
-            presentation = create_presentation(topic, items, search_terms)
+            presentation = create_presentation(topic, items, search_terms, prefetched_images)
         except Exception as create_error:
             logging.error(f"Failed to create presentation: {str(create_error)}")
             flash('Unable to create presentation due to API limits. Please try again in a few minutes.', 'error')
@@ -110,6 +110,6 @@ echo ""
 echo "🚀 To start the application manually:"
 echo "   cd $DEPLOY_DIR"
 echo "   source venv/bin/activate" 
-echo "   gunicorn --bind 0.0.0.0:5000 main:app"
+echo "   gunicorn -c gunicorn.conf.py main:app"
 echo ""
 echo "🌐 Your application will be available at: http://$DOMAIN"
\ No newline at end of file
@@ -0,0 +1,28 @@
+import os
+
+# Gunicorn configuration for KinderSlides
+# Deck generation spends nearly all of its time waiting on Pixabay/OpenAI,
+# so each worker runs many threads (gthread) or greenlets (gevent).
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+
+# Worker model: "gthread" (default) or "gevent" (requires `pip install gevent`)
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+# Keep the default small: each worker holds a full Flask/python-pptx process
+# and up to `threads` decks' images in memory (Render's free plan has 512 MB)
+workers = int(os.environ.get("GUNICORN_WORKERS", os.environ.get("WEB_CONCURRENCY", "2")))
+
+# Concurrent requests per gthread worker
+threads = int(os.environ.get("GUNICORN_THREADS", "32"))
+
+# Concurrent requests per gevent worker
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", "256"))
+
+# A full ABC deck makes dozens of image searches, so allow long requests
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "180"))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("GUNICORN_LOG_LEVEL", "info")
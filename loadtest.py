@@ -0,0 +1,131 @@
+"""Simple load test for KinderSlides deck generation.
+
+Fires N concurrent POST /generate requests at a running server and reports
+throughput. Start the server with a fixed worker count first, e.g.:
+
+    GUNICORN_WORKERS=2 gunicorn -c gunicorn.conf.py main:app
+    python loadtest.py --url http://localhost:5000 --concurrency 50 --requests 200
+
+To measure without hitting Pixabay, run the built-in stub (it answers searches
+and image downloads after a fixed delay) and point the app at it:
+
+    python loadtest.py --stub-pixabay 8001 --stub-latency 0.2
+    PIXABAY_BASE_URL=http://localhost:8001/api/ PIXABAY_API_KEY=stub \\
+        GUNICORN_WORKERS=2 gunicorn -c gunicorn.conf.py main:app
+"""
+import argparse
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+PPTX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.presentationml.presentation'
+
+
+def generate_deck(url, topic, custom_topic, custom_items):
+    """Request a single deck and return (succeeded, elapsed seconds)"""
+    form = {'topic': topic}
+    if topic == 'custom':
+        form['custom_topic'] = custom_topic
+        form['custom_items'] = custom_items
+
+    start = time.perf_counter()
+    try:
+        response = requests.post(f"{url}/generate", data=form, timeout=600, allow_redirects=False)
+        succeeded = response.status_code == 200 and response.headers.get('Content-Type', '').startswith(PPTX_MIMETYPE)
+    except Exception:
+        succeeded = False
+    return succeeded, time.perf_counter() - start
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted, non-empty list"""
+    rank = max(1, math.ceil(percent / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def serve_stub_pixabay(port, latency):
+    """Serve a fake Pixabay search API and image host on the given port"""
+    from PIL import Image
+
+    buffer = BytesIO()
+    Image.new('RGB', (400, 300), (52, 152, 219)).save(buffer, format='PNG')
+    image_bytes = buffer.getvalue()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            parsed = urlparse(self.path)
+            if parsed.path.startswith('/image'):
+                body, content_type = image_bytes, 'image/png'
+            else:
+                # Tag every hit with the query words so tag validation passes
+                query = parse_qs(parsed.query).get('q', [''])[0]
+                tags = ', '.join(word.lower() for word in query.split())
+                hits = [
+                    {'id': i, 'tags': tags, 'webformatURL': f"http://localhost:{port}/image/{i}.png"}
+                    for i in range(3)
+                ]
+                body, content_type = json.dumps({'hits': hits}).encode('utf-8'), 'application/json'
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    print(f"Stub Pixabay listening on http://localhost:{port}/api/ ({latency}s latency)")
+    ThreadingHTTPServer(('0.0.0.0', port), StubHandler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test KinderSlides deck generation")
+    parser.add_argument('--url', default='http://localhost:5000', help="Base URL of the running server")
+    parser.add_argument('--concurrency', type=int, default=20, help="Number of concurrent deck requests")
+    parser.add_argument('--requests', type=int, default=100, help="Total number of deck requests")
+    parser.add_argument('--topic', default='Shapes', help="Predefined topic, or 'custom'")
+    parser.add_argument('--custom-topic', default='Animals')
+    parser.add_argument('--custom-items', default='Dog, Cat, Lion, Tiger, Horse')
+    parser.add_argument('--stub-pixabay', type=int, metavar='PORT', help="Run a stub Pixabay server instead of a load test")
+    parser.add_argument('--stub-latency', type=float, default=0.2, help="Seconds the stub waits before each response")
+    args = parser.parse_args()
+
+    if args.stub_pixabay:
+        serve_stub_pixabay(args.stub_pixabay, args.stub_latency)
+        return
+
+    if args.requests < 1 or args.concurrency < 1:
+        parser.error("--requests and --concurrency must be at least 1")
+
+    print(f"Sending {args.requests} '{args.topic}' deck requests to {args.url} "
+          f"with concurrency {args.concurrency}")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        futures = [
+            executor.submit(generate_deck, args.url, args.topic, args.custom_topic, args.custom_items)
+            for _ in range(args.requests)
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for _, latency in results)
+    succeeded = sum(1 for ok, _ in results if ok)
+
+    print(f"Completed:   {succeeded}/{len(results)} decks")
+    print(f"Wall time:   {elapsed:.1f}s")
+    print(f"Throughput:  {succeeded / elapsed:.2f} decks/s")
+    print(f"Latency p50: {percentile(latencies, 50):.1f}s")
+    print(f"Latency p95: {percentile(latencies, 95):.1f}s")
+    print(f"Latency max: {latencies[-1]:.1f}s")
+
+
+if __name__ == '__main__':
+    main()